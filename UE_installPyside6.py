@@ -1,56 +1,109 @@
 # InstallPyside6.py by AurifexChandra
 
-# This script installs PySide6 into the Unreal Engine's embedded Python environment by getting engine's python directory and executes installation command through cmd terminal.
+# This script installs PySide6 into the Unreal Engine's embedded Python environment by getting engine's python directory and executes the pip installation command, forwarding its output to the Unreal Output Log.
 # The directory looks like this, so one can perform manual tasks if needed:
 # C:\Program Files\Epic Games\UE_5.4\Engine\Binaries\ThirdParty\Python3\Win64
 
 import os
+import re
 import sys
-import glob
+import functools
 import subprocess
 from pathlib import Path
-from typing import Optional, List
-import unreal
-
-def _guess_embedded_python_exe_from_editor(editor_exe: Path) -> Optional[Path]:
-    """
-    Given .../Engine/Binaries/Win64/UnrealEditor.exe (or platform equivalent),
-    return .../Engine/Binaries/ThirdParty/Python3/<plat>/python(.exe)
-    """
-    # Engine root: .../Engine
-    try:
-        engine_dir = editor_exe.parents[2]  # Win64 -> Binaries -> Engine
-        thirdparty = engine_dir / "Binaries" / "ThirdParty"
-        # Platform mapping
-        if sys.platform.startswith("win"):
-            candidates = [
-                thirdparty / "Python3" / "Win64" / "python.exe",
-                thirdparty / "Python3" / "Win64" / "python3.exe",
-            ]
-        elif sys.platform == "darwin":
-            candidates = [
-                thirdparty / "Python3" / "Mac" / "bin" / "python3",
-            ]
-        else:  # Linux
-            candidates = [
-                thirdparty / "Python3" / "Linux" / "bin" / "python3",
-            ]
-
-        for c in candidates:
-            if c.exists():
-                return c
-
-        # Fallback: glob any python* under ThirdParty/Python*
-        hits = glob.glob(str(thirdparty / "Python*" / "**" / "python*"), recursive=True)
-        for h in hits:
-            p = Path(h)
-            if p.is_file() and os.access(p, os.X_OK):
-                return p
-    except Exception:
-        pass
+from typing import Optional, List, Tuple
+
+
+class _LazyUnreal:
+    """
+    Defers `import unreal` until the first attribute access, so the helpers that don't log
+    (e.g. the embedded Python resolver) can be imported outside the editor.
+    """
+    def __getattr__(self, name):
+        import unreal
+        self.__dict__.update(unreal.__dict__)
+        return getattr(unreal, name)
+
+
+unreal = _LazyUnreal()
+
+_IS_WIN = sys.platform.startswith("win")
+_IS_MAC = sys.platform == "darwin"
+# Keeps pip subprocesses from opening a console window (Windows only flag)
+_NO_WINDOW = subprocess.CREATE_NO_WINDOW if _IS_WIN else 0
+
+# python, python3, python3.11, python.exe, ... (but not python3-config or python311.dll)
+_PYTHON_EXE_RE = re.compile(r"python(?:\d+(?:\.\d+)*)?(?:\.exe)?", re.IGNORECASE)
+
+
+def _scan_for_python(thirdparty: Path) -> Optional[Path]:
+    """
+    Walks .../ThirdParty/Python*/ and returns the first python executable found.
+    Stops at the first match instead of listing the whole tree.
+    """
+    with os.scandir(thirdparty) as it:
+        tops = [e.path for e in it if e.name.startswith("Python") and e.is_dir()]
+
+    for top in tops:
+        stack = [top]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                # Skip unreadable directories instead of aborting the whole search
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif _PYTHON_EXE_RE.fullmatch(entry.name) and entry.is_file():
+                        # X_OK is meaningless on Windows
+                        if _IS_WIN or os.access(entry.path, os.X_OK):
+                            return Path(entry.path)
     return None
 
 
+def _make_python_guesser(subpaths):
+    """
+    Builds a resolver with the platform's interpreter locations (relative to ThirdParty) baked in.
+    """
+    def guess(editor_exe: Path) -> Optional[Path]:
+        """
+        Given .../Engine/Binaries/Win64/UnrealEditor.exe (or platform equivalent),
+        return .../Engine/Binaries/ThirdParty/Python3/<plat>/python(.exe)
+        """
+        # Engine root: .../Engine
+        try:
+            engine_dir = editor_exe.parents[2]  # Win64 -> Binaries -> Engine
+            thirdparty = engine_dir / "Binaries" / "ThirdParty"
+            for c in (thirdparty.joinpath(*sub) for sub in subpaths):
+                if c.exists():
+                    return c
+
+            # Fallback: scan ThirdParty/Python* for the first python executable
+            return _scan_for_python(thirdparty)
+        except Exception:
+            pass
+        return None
+    return guess
+
+
+_guess_win = _make_python_guesser((
+    ("Python3", "Win64", "python.exe"),
+    ("Python3", "Win64", "python3.exe"),
+))
+_guess_mac = _make_python_guesser((
+    ("Python3", "Mac", "bin", "python3"),
+))
+_guess_linux = _make_python_guesser((
+    ("Python3", "Linux", "bin", "python3"),
+))
+
+# The platform never changes at runtime, so pick the platform's resolver once at import
+_guess_embedded_python_exe_from_editor = functools.lru_cache(maxsize=1)(
+    _guess_win if _IS_WIN else _guess_mac if _IS_MAC else _guess_linux
+)
+
+
 def get_unreal_editor_exe() -> Path:
     """
     In some UE versions Python reports UnrealEditor.exe as sys.executable.
@@ -63,9 +116,11 @@ def get_unreal_editor_exe() -> Path:
     return Path(sys.argv[0]).resolve()
 
 
+@functools.lru_cache(maxsize=1)
 def get_embedded_python_exe() -> Optional[Path]:
     """
     Returns the engine-embedded Python interpreter path even if sys.executable is UnrealEditor.exe.
+    The result is cached so the filesystem lookup only happens once per session.
     """
     editor_exe = get_unreal_editor_exe()
     py = _guess_embedded_python_exe_from_editor(editor_exe)
@@ -75,69 +130,90 @@ def get_embedded_python_exe() -> Optional[Path]:
     return None
 
 
-def pip_install_into_engine_sitepackages(package: str = "PySide2", extra_args: Optional[List[str]] = None) -> bool:
+def _run_py(cmd: List[str]) -> Tuple[int, str]:
+    """
+    Runs an embedded Python command without flashing a console window over the editor on Windows.
+    stdout and stderr (where pip writes its warnings) are merged and sent to the Unreal log line by line
+    as they arrive. Returns the exit code and the full output, decoded as UTF-8.
+    """
+    lines = []
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          creationflags=_NO_WINDOW) as proc:
+        for raw in proc.stdout:
+            line = raw.decode("utf-8", "replace").rstrip()
+            unreal.log(line)
+            lines.append(line)
+    return proc.returncode, "\n".join(lines)
+
+
+def pip_install_into_engine_sitepackages(package: str = "PySide2", extra_args: Optional[List[str]] = None,
+                                         py: Optional[Path] = None) -> bool:
     """
     Installs into the Engine's embedded Python site-packages (requires write permission to Engine install).
     """
-    py = get_embedded_python_exe()
+    py = py or get_embedded_python_exe()
     if not py:
         unreal.log_error("No embedded Python found.")
         return False
 
-    cmd = [str(py), "-m", "pip", "install", "--no-warn-script-location", "PySide6"]
+    cmd = [str(py), "-m", "pip", "--disable-pip-version-check", "--no-input",
+           "install", "--only-binary=:all:", "--prefer-binary", "--no-warn-script-location", "PySide6"]
     if extra_args:
         cmd.extend(extra_args)
     unreal.log(f"Running: {' '.join(cmd)}")
-    try:
-        subprocess.check_call(cmd)
-        unreal.log("Installed into Engine Python site-packages.")
-        return True
-    except subprocess.CalledProcessError as e:
-        unreal.log_error(f"pip failed: {e}")
+    # No console window is shown, so pip's output is forwarded to the Unreal log
+    returncode, output = _run_py(cmd)
+    if returncode != 0:
+        unreal.log_error(f"pip failed (exit code {returncode}):\n{output}")
         return False
+    unreal.log("Installed into Engine Python site-packages.")
+    return True
 
-def ensure_pyside2():
+def ensure_pyside2(py: Optional[Path] = None):
     """
     Ensures PySide6 is available in the engine's embedded Python environment.
     """
     import importlib.util
-    if importlib.util.find_spec("PySide6"):
+    # A sys.modules lookup is much cheaper than find_spec's walk over the path finders
+    if "PySide6" in sys.modules or importlib.util.find_spec("PySide6"):
         unreal.log("✅ PySide6 already available.")
         return True
 
     unreal.log_warning("PySide6 not found. Attempting installation...")
-    return pip_install_into_engine_sitepackages("PySide6")
+    return pip_install_into_engine_sitepackages("PySide6", py=py)
 
 # --- Optional utilities to assist users ---
 
 
-def open_python_folder_in_explorer():
-    py = get_embedded_python_exe()
+def open_python_folder_in_explorer(py: Optional[Path] = None):
+    py = py or get_embedded_python_exe()
     if not py:
         unreal.log_error("No embedded Python found.")
         return
     folder = py.parent
     unreal.log(f"Python folder: {folder}")
     unreal.log(f"Opening: {folder}")
-    if sys.platform.startswith("win"):
+    if _IS_WIN:
         subprocess.Popen(["explorer", str(folder)])
-    elif sys.platform == "darwin":
+    elif _IS_MAC:
         subprocess.Popen(["open", str(folder)])
     else:
         subprocess.Popen(["xdg-open", str(folder)])
 
 
-def open_cmd_at_python():
-    py = get_embedded_python_exe()
+def open_cmd_at_python(py: Optional[Path] = None):
+    py = py or get_embedded_python_exe()
     if not py:
         unreal.log_error("No embedded Python found.")
         return
     folder = py.parent
     unreal.log(f"Python folder: {folder}")
     unreal.log(f"Opening CMD at: {folder}")
-    if sys.platform.startswith("win"):
+    if _IS_WIN:
         subprocess.Popen("cmd.exe", cwd=str(folder))
     else:
         unreal.log_warning("CMD helper is Windows-only.")
 
-ensure_pyside2()
\ No newline at end of file
+# Main execution
+if __name__ == "__main__":
+    ensure_pyside2()
@@ -1,56 +1,109 @@
 # UninstallPyside6.py by AurifexChandra
 
-# This script uninstalls PySide6 from the Unreal Engine's embedded Python environment by getting engine's python directory and executes uninstall command through cmd terminal.
+# This script uninstalls PySide6 from the Unreal Engine's embedded Python environment by getting engine's python directory and executes the pip uninstall command, forwarding its output to the Unreal Output Log.
 # The directory looks like this, so one can perform manual tasks if needed:
 # C:\Program Files\Epic Games\UE_5.4\Engine\Binaries\ThirdParty\Python3\Win64
 
 import os
+import re
 import sys
-import glob
+import functools
 import subprocess
 from pathlib import Path
-from typing import Optional, List
-import unreal
+from typing import Optional, List, Tuple
 
-def _guess_embedded_python_exe_from_editor(editor_exe: Path) -> Optional[Path]:
+
+class _LazyUnreal:
     """
-    Given .../Engine/Binaries/Win64/UnrealEditor.exe (or platform equivalent),
-    return .../Engine/Binaries/ThirdParty/Python3/<plat>/python(.exe)
+    Defers `import unreal` until the first attribute access, so the helpers that don't log
+    (e.g. the embedded Python resolver) can be imported outside the editor.
     """
-    # Engine root: .../Engine
-    try:
-        engine_dir = editor_exe.parents[2]  # Win64 -> Binaries -> Engine
-        thirdparty = engine_dir / "Binaries" / "ThirdParty"
-        # Platform mapping
-        if sys.platform.startswith("win"):
-            candidates = [
-                thirdparty / "Python3" / "Win64" / "python.exe",
-                thirdparty / "Python3" / "Win64" / "python3.exe",
-            ]
-        elif sys.platform == "darwin":
-            candidates = [
-                thirdparty / "Python3" / "Mac" / "bin" / "python3",
-            ]
-        else:  # Linux
-            candidates = [
-                thirdparty / "Python3" / "Linux" / "bin" / "python3",
-            ]
-
-        for c in candidates:
-            if c.exists():
-                return c
-
-        # Fallback: glob any python* under ThirdParty/Python*
-        hits = glob.glob(str(thirdparty / "Python*" / "**" / "python*"), recursive=True)
-        for h in hits:
-            p = Path(h)
-            if p.is_file() and os.access(p, os.X_OK):
-                return p
-    except Exception:
-        pass
+    def __getattr__(self, name):
+        import unreal
+        self.__dict__.update(unreal.__dict__)
+        return getattr(unreal, name)
+
+
+unreal = _LazyUnreal()
+
+_IS_WIN = sys.platform.startswith("win")
+_IS_MAC = sys.platform == "darwin"
+# Keeps pip subprocesses from opening a console window (Windows only flag)
+_NO_WINDOW = subprocess.CREATE_NO_WINDOW if _IS_WIN else 0
+
+# python, python3, python3.11, python.exe, ... (but not python3-config or python311.dll)
+_PYTHON_EXE_RE = re.compile(r"python(?:\d+(?:\.\d+)*)?(?:\.exe)?", re.IGNORECASE)
+
+
+def _scan_for_python(thirdparty: Path) -> Optional[Path]:
+    """
+    Walks .../ThirdParty/Python*/ and returns the first python executable found.
+    Stops at the first match instead of listing the whole tree.
+    """
+    with os.scandir(thirdparty) as it:
+        tops = [e.path for e in it if e.name.startswith("Python") and e.is_dir()]
+
+    for top in tops:
+        stack = [top]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                # Skip unreadable directories instead of aborting the whole search
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif _PYTHON_EXE_RE.fullmatch(entry.name) and entry.is_file():
+                        # X_OK is meaningless on Windows
+                        if _IS_WIN or os.access(entry.path, os.X_OK):
+                            return Path(entry.path)
     return None
 
 
+def _make_python_guesser(subpaths):
+    """
+    Builds a resolver with the platform's interpreter locations (relative to ThirdParty) baked in.
+    """
+    def guess(editor_exe: Path) -> Optional[Path]:
+        """
+        Given .../Engine/Binaries/Win64/UnrealEditor.exe (or platform equivalent),
+        return .../Engine/Binaries/ThirdParty/Python3/<plat>/python(.exe)
+        """
+        # Engine root: .../Engine
+        try:
+            engine_dir = editor_exe.parents[2]  # Win64 -> Binaries -> Engine
+            thirdparty = engine_dir / "Binaries" / "ThirdParty"
+            for c in (thirdparty.joinpath(*sub) for sub in subpaths):
+                if c.exists():
+                    return c
+
+            # Fallback: scan ThirdParty/Python* for the first python executable
+            return _scan_for_python(thirdparty)
+        except Exception:
+            pass
+        return None
+    return guess
+
+
+_guess_win = _make_python_guesser((
+    ("Python3", "Win64", "python.exe"),
+    ("Python3", "Win64", "python3.exe"),
+))
+_guess_mac = _make_python_guesser((
+    ("Python3", "Mac", "bin", "python3"),
+))
+_guess_linux = _make_python_guesser((
+    ("Python3", "Linux", "bin", "python3"),
+))
+
+# The platform never changes at runtime, so pick the platform's resolver once at import
+_guess_embedded_python_exe_from_editor = functools.lru_cache(maxsize=1)(
+    _guess_win if _IS_WIN else _guess_mac if _IS_MAC else _guess_linux
+)
+
+
 def get_unreal_editor_exe() -> Path:
     """
     In some UE versions Python reports UnrealEditor.exe as sys.executable.
@@ -63,9 +116,11 @@ def get_unreal_editor_exe() -> Path:
     return Path(sys.argv[0]).resolve()
 
 
+@functools.lru_cache(maxsize=1)
 def get_embedded_python_exe() -> Optional[Path]:
     """
     Returns the engine-embedded Python interpreter path even if sys.executable is UnrealEditor.exe.
+    The result is cached so the filesystem lookup only happens once per session.
     """
     editor_exe = get_unreal_editor_exe()
     py = _guess_embedded_python_exe_from_editor(editor_exe)
@@ -75,26 +130,49 @@ def get_embedded_python_exe() -> Optional[Path]:
     return None
 
 
-def pip_uninstall_from_engine_sitepackages(package: str = "PySide6", extra_args: Optional[List[str]] = None) -> bool:
+def _run_py(cmd: List[str]) -> Tuple[int, str]:
+    """
+    Runs an embedded Python command without flashing a console window over the editor on Windows.
+    stdout and stderr (where pip writes its warnings) are merged and sent to the Unreal log line by line
+    as they arrive. Returns the exit code and the full output, decoded as UTF-8.
+    """
+    lines = []
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          creationflags=_NO_WINDOW) as proc:
+        for raw in proc.stdout:
+            line = raw.decode("utf-8", "replace").rstrip()
+            unreal.log(line)
+            lines.append(line)
+    return proc.returncode, "\n".join(lines)
+
+
+def pip_uninstall_from_engine_sitepackages(package: str = "PySide6", extra_args: Optional[List[str]] = None,
+                                           py: Optional[Path] = None) -> bool:
     """
     Uninstalls from the Engine's embedded Python site-packages (requires write permission to Engine install).
     """
-    py = get_embedded_python_exe()
+    py = py or get_embedded_python_exe()
     if not py:
         unreal.log_error("No embedded Python found.")
         return False
 
-    cmd = [str(py), "-m", "pip", "uninstall", "--yes", package]
+    cmd = [str(py), "-m", "pip", "--disable-pip-version-check", "--no-input",
+           "uninstall", "--yes", package]
     if extra_args:
         cmd.extend(extra_args)
     unreal.log(f"Running: {' '.join(cmd)}")
-    try:
-        subprocess.check_call(cmd)
-        unreal.log(f"Successfully uninstalled {package} from Engine Python site-packages.")
-        return True
-    except subprocess.CalledProcessError as e:
-        unreal.log_error(f"pip uninstall failed: {e}")
+    returncode, output = _run_py(cmd)
+    if returncode != 0:
+        unreal.log_error(f"pip uninstall failed (exit code {returncode}):\n{output}")
         return False
+    # pip exits with 0 even when it skips a package that isn't installed, so look for its
+    # "Skipping <package> as it is not installed." warning. This relies on pip's log text, but unlike
+    # "Successfully uninstalled" the warning is still printed when -q/--quiet is passed in extra_args.
+    if "as it is not installed" in output:
+        unreal.log_warning(f"pip did not uninstall {package}.")
+        return False
+    unreal.log(f"Successfully uninstalled {package} from Engine Python site-packages.")
+    return True
 
 
 def check_pyside6_installed() -> bool:
@@ -110,21 +188,21 @@ def check_pyside6_installed() -> bool:
 def get_pyside6_installation_info() -> Optional[str]:
     """
     Gets information about the currently installed PySide6 package.
+    Reads the distribution metadata in-process instead of spawning `pip show`.
     """
-    py = get_embedded_python_exe()
-    if not py:
-        unreal.log_error("No embedded Python found.")
-        return None
-
-    cmd = [str(py), "-m", "pip", "show", "PySide6"]
+    from importlib.metadata import distribution, PackageNotFoundError
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError:
+        dist = distribution("PySide6")
+    except PackageNotFoundError:
         return None
+    return (
+        f"Name: {dist.metadata['Name']}\n"
+        f"Version: {dist.version}\n"
+        f"Location: {dist.locate_file('')}\n"
+    )
 
 
-def uninstall_pyside6():
+def uninstall_pyside6(py: Optional[Path] = None):
     """
     Uninstalls PySide6 from the engine's embedded Python environment.
     """
@@ -132,128 +210,128 @@ def uninstall_pyside6():
         unreal.log("❌ PySide6 is not installed in the engine's Python environment.")
         return False
 
-    # Show installation info before uninstalling
+    # Show installation info before uninstalling (read in-process, no pip call)
     info = get_pyside6_installation_info()
     if info:
         unreal.log("📋 Current PySide6 installation info:")
         unreal.log(info)
 
     unreal.log_warning("🗑️ Attempting to uninstall PySide6...")
-    success = pip_uninstall_from_engine_sitepackages("PySide6")
+    success = pip_uninstall_from_engine_sitepackages("PySide6", py=py)
     
     if success:
-        # Verify uninstall
-        if not check_pyside6_installed():
-            unreal.log("✅ PySide6 successfully uninstalled and verified.")
-            return True
-        else:
-            unreal.log_warning("⚠️ Uninstall command completed but PySide6 still appears to be available.")
-            return False
+        # pip's own output is the verification: find_spec may still see an already-imported PySide6
+        unreal.log("✅ PySide6 successfully uninstalled and verified.")
+        return True
     else:
         unreal.log_error("❌ Failed to uninstall PySide6.")
         return False
 
 
+# Matches any site-packages entry whose name contains pyside6 or shiboken6 (case-insensitive)
+_PYSIDE_REMNANT_RE = re.compile(r"(?:pyside6|shiboken6)", re.IGNORECASE)
+
+
 def cleanup_pyside6_cache():
     """
     Attempts to clean up any remaining PySide6 cache files and directories.
     """
-    py = get_embedded_python_exe()
-    if not py:
-        unreal.log_error("No embedded Python found.")
-        return False
+    # This script runs inside the engine's embedded Python, so its site-packages can be queried directly
+    import site
+    site_packages = Path(site.getsitepackages()[0])
 
-    # Get site-packages directory
-    cmd = [str(py), "-c", "import site; print(site.getsitepackages()[0])"]
+    # Look for PySide6 related directories and files in a single directory pass
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        site_packages = Path(result.stdout.strip())
-        
-        # Look for PySide6 related directories and files
-        pyside_paths = []
-        patterns = ["PySide6*", "shiboken6*", "*pyside6*"]
-        
-        for pattern in patterns:
-            pyside_paths.extend(site_packages.glob(pattern))
-        
-        if pyside_paths:
-            unreal.log("🧹 Found potential PySide6 remnants:")
-            for path in pyside_paths:
-                unreal.log(f"  - {path}")
-                try:
-                    if path.is_dir():
-                        import shutil
-                        shutil.rmtree(path)
-                        unreal.log(f"  ✅ Removed directory: {path}")
-                    else:
-                        path.unlink()
-                        unreal.log(f"  ✅ Removed file: {path}")
-                except Exception as e:
-                    unreal.log_warning(f"  ⚠️ Could not remove {path}: {e}")
-            return True
-        else:
-            unreal.log("✅ No PySide6 remnants found.")
-            return True
-            
-    except subprocess.CalledProcessError as e:
-        unreal.log_error(f"Failed to get site-packages directory: {e}")
+        with os.scandir(site_packages) as it:
+            pyside_paths = [Path(e.path) for e in it if _PYSIDE_REMNANT_RE.search(e.name)]
+    except OSError as e:
+        unreal.log_error(f"Failed to read site-packages directory: {e}")
         return False
 
+    if pyside_paths:
+        # Collect messages and log them in one call each, rather than once per path
+        removed = []
+        failed = []
+        for path in pyside_paths:
+            try:
+                # Unlink symlinks instead of following them out of site-packages
+                if path.is_symlink():
+                    path.unlink()
+                    removed.append(f"  ✅ Removed link: {path}")
+                elif path.is_dir():
+                    # shutil.rmtree already walks with scandir and refuses symlinks/junctions
+                    import shutil
+                    shutil.rmtree(path)
+                    removed.append(f"  ✅ Removed directory: {path}")
+                else:
+                    path.unlink()
+                    removed.append(f"  ✅ Removed file: {path}")
+            except Exception as e:
+                failed.append(f"  ⚠️ Could not remove {path}: {e}")
+
+        unreal.log("🧹 Found potential PySide6 remnants:\n" + "\n".join(f"  - {p}" for p in pyside_paths))
+        if removed:
+            unreal.log("\n".join(removed))
+        if failed:
+            unreal.log_warning("\n".join(failed))
+        return True
+    else:
+        unreal.log("✅ No PySide6 remnants found.")
+        return True
+
 
 # --- Optional utilities to assist users ---
 
-def open_python_folder_in_explorer():
+def open_python_folder_in_explorer(py: Optional[Path] = None):
     """
     Opens the engine's Python folder in the system file explorer.
     """
-    py = get_embedded_python_exe()
+    py = py or get_embedded_python_exe()
     if not py:
         unreal.log_error("No embedded Python found.")
         return
     folder = py.parent
     unreal.log(f"Python folder: {folder}")
     unreal.log(f"Opening: {folder}")
-    if sys.platform.startswith("win"):
+    if _IS_WIN:
         subprocess.Popen(["explorer", str(folder)])
-    elif sys.platform == "darwin":
+    elif _IS_MAC:
         subprocess.Popen(["open", str(folder)])
     else:
         subprocess.Popen(["xdg-open", str(folder)])
 
 
-def open_cmd_at_python():
+def open_cmd_at_python(py: Optional[Path] = None):
     """
     Opens a command prompt at the engine's Python directory (Windows only).
     """
-    py = get_embedded_python_exe()
+    py = py or get_embedded_python_exe()
     if not py:
         unreal.log_error("No embedded Python found.")
         return
     folder = py.parent
     unreal.log(f"Python folder: {folder}")
     unreal.log(f"Opening CMD at: {folder}")
-    if sys.platform.startswith("win"):
+    if _IS_WIN:
         subprocess.Popen("cmd.exe", cwd=str(folder))
     else:
         unreal.log_warning("CMD helper is Windows-only.")
 
 
-def list_installed_packages():
+def list_installed_packages(py: Optional[Path] = None):
     """
     Lists all packages installed in the engine's embedded Python environment.
     """
-    py = get_embedded_python_exe()
+    py = py or get_embedded_python_exe()
     if not py:
         unreal.log_error("No embedded Python found.")
         return
 
     cmd = [str(py), "-m", "pip", "list"]
     unreal.log("📦 Packages installed in engine Python:")
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        unreal.log(result.stdout)
-    except subprocess.CalledProcessError as e:
-        unreal.log_error(f"Failed to list packages: {e}")
+    returncode, output = _run_py(cmd)
+    if returncode != 0:
+        unreal.log_error(f"Failed to list packages (exit code {returncode}):\n{output}")
 
 
 # Main execution
@@ -265,8 +343,8 @@ if __name__ == "__main__":
     if check_pyside6_installed():
         unreal.log("📋 PySide6 is currently installed.")
         
-        # Perform uninstall
-        if uninstall_pyside6():
+        # Perform uninstall, resolving the embedded Python once for all helpers
+        if uninstall_pyside6(get_embedded_python_exe()):
             # Clean up any remaining files
             cleanup_pyside6_cache()
             unreal.log("🎉 PySide6 uninstallation completed successfully!")
@@ -276,6 +354,3 @@ if __name__ == "__main__":
         unreal.log("ℹ️ PySide6 is not currently installed in the engine's Python environment.")
     
     unreal.log("=" * 50)
-
-# Execute the uninstall process
-uninstall_pyside6()